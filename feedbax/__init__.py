@@ -69,6 +69,17 @@ else:
 
 LOG_LEVEL = os.environ.get("FEEDBAX_LOG_LEVEL", DEFAULT_LOG_LEVEL).upper()
 
+# Opt in to JAX's persistent compilation cache, so that repeated runs can reuse
+# compiled programs. Cache all of them, since many small models compile quickly.
+CACHE_DIR = os.environ.get("FEEDBAX_CACHE_DIR")
+
+if CACHE_DIR:
+    import jax
+
+    jax.config.update("jax_compilation_cache_dir", os.path.expanduser(CACHE_DIR))
+    jax.config.update("jax_persistent_cache_min_entry_size_bytes", 0)
+    jax.config.update("jax_persistent_cache_min_compile_time_secs", 0)
+
 
 logger = logging.getLogger(__package__)
 logger.addHandler(logging.NullHandler())
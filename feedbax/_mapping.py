@@ -86,12 +86,21 @@ class AbstractTransformedOrderedDict(MutableMapping[KT2, VT], Generic[KT1, KT2,
         ...
 
     def tree_flatten(self):
-        """The same flatten function used by JAX for `dict`"""
-        return tuple(self.values()), tuple(self.keys())
+        """Flatten the values in insertion order, carrying the keys as auxiliary data.
+
+        Reads directly from `store`, and includes the already-transformed keys in
+        the auxiliary data, so that neither flattening nor unflattening needs to
+        call `_key_transform` again.
+        """
+        keys, values = unzip2(self.store.values())
+        return values, (tuple(self.store.keys()), keys)
 
     @classmethod
-    def tree_unflatten(cls, keys, values):
-        return cls(zip(keys, values))
+    def tree_unflatten(cls, aux_data, values):
+        store_keys, keys = aux_data
+        obj = cls.__new__(cls)
+        obj.store = OrderedDict(zip(store_keys, zip(keys, values)))
+        return obj
 
 
 class _QuotelessStr(str):
@@ -29,7 +29,7 @@ import inspect
 import logging
 from abc import abstractmethod
 from collections.abc import Callable, Mapping, Sequence
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from functools import cached_property, partial
 from typing import (
     TYPE_CHECKING,
@@ -48,6 +48,7 @@ import jax
 import jax.numpy as jnp
 import jax.tree as jt
 import jax.tree_util as jtu
+import numpy as np
 from equinox import AbstractVar, Module, field
 from jax_cookbook.misc import moving_avg, softmin
 from jaxtyping import Array, ArrayLike, Float, PyTree
@@ -172,6 +173,10 @@ class TermTree[T](Mapping[str, "TermTree"]):
         times: Callable[[Array, Array], Array] = jnp.multiply,  # how to apply weights
         zero: Array | float = 0.0,  # identity for `plus`
     ) -> Array:
+        # The default weighted sum is computed with one contraction per branch
+        if plus is jnp.add and times is jnp.multiply:
+            return jnp.asarray(self.weight) * self._weighted_sum(leaf_fn, zero)
+
         # (a) how to evaluate a leaf:
         def _on_leaf(node: "TermTree") -> Array:
             f = node.leaf_fn if leaf_fn is None else leaf_fn
@@ -185,6 +190,34 @@ class TermTree[T](Mapping[str, "TermTree"]):
 
         return self.fold(on_leaf=_on_leaf, on_branch=_on_branch)
 
+    def _weighted_sum(
+        self,
+        leaf_fn: Optional[Callable[[Array], Array]],
+        zero: Array | float,
+    ) -> Array:
+        """Sum the values of the children of this node, weighted by their weights.
+
+        The weights of the children are gathered into one array, so they can be
+        applied to the stacked child values in a single contraction.
+        """
+        if self.value is not None:
+            f = self.leaf_fn if leaf_fn is None else leaf_fn
+            return f(self.value)
+
+        vals = [child._weighted_sum(leaf_fn, zero) for child in self.children]
+        weights = [child.weight for child in self.children]
+        if not vals:
+            return jnp.asarray(zero)
+        elif len(vals) == 1:
+            acc = weights[0] * vals[0]
+        elif len(vals) == 2:
+            acc = weights[0] * vals[0] + weights[1] * vals[1]
+        else:
+            acc = jnp.tensordot(
+                jnp.asarray(weights), jnp.stack(jnp.broadcast_arrays(*vals)), axes=1
+            )
+        return acc + zero
+
     @property
     def total(self) -> Array:
         """Return the node-weighted scalar sum of all leaves in this tree."""
@@ -291,9 +324,11 @@ class AbstractLoss(Module):
         trial_specs: "TaskTrialSpec",
         model: AbstractModel,
     ) -> TermTree["AbstractLoss"]:
+        # Scalar terms (e.g. `ModelLoss`) get a length-1 axis, so that all leaf values
+        # can be reduced over their trailing (trial) axis in the same way.
         return TermTree.leaf(
             self.label,
-            self.term(states, trial_specs, model),
+            jnp.atleast_1d(self.term(states, trial_specs, model)),
             originator=self,
         )
 
@@ -447,7 +482,7 @@ class FuncTermsLoss[T](AbstractTermedLoss):
         ctx = self.build_context(states, trial_specs, model)
         children = {}
         for name, fn in self.terms.items():
-            v = fn(ctx)
+            v = jnp.atleast_1d(fn(ctx))
             # v = v if v.shape == () else self.reduce(v)  # enforce scalar per component
             leaf = TermTree.leaf(name, v).with_weight(self.weights.get(name, 1.0))
             children[name] = leaf
@@ -519,39 +554,36 @@ class CompositeLoss(AbstractTermedLoss):
             raise ValueError("Mismatch between number of loss terms and number of term weights")
 
         # Split into lists of data for simple and composite terms.
-        term_tuples_split: Tuple[
-            Sequence[Tuple[str, AbstractLoss, float]],
-            Sequence[Tuple[str, AbstractLoss, float]],
-        ]
-        term_tuples_split = eqx.partition(
-            list(zip(labels, terms, weight_values)),
-            lambda x: not isinstance(x[1], CompositeLoss),
-            is_leaf=lambda x: isinstance(x, tuple),
-        )
+        simple_terms: list[Tuple[str, AbstractLoss, float]] = []
+        composite_terms: list[Tuple[str, CompositeLoss, float]] = []
+        for term_tuple in zip(labels, terms, weight_values):
+            if isinstance(term_tuple[1], CompositeLoss):
+                composite_terms.append(term_tuple)
+            else:
+                simple_terms.append(term_tuple)
 
-        # Removes the `None` values from the lists.
-        term_tuples_leaves = jt.map(
-            lambda x: jtu.tree_leaves(x, is_leaf=lambda x: isinstance(x, tuple)),
-            term_tuples_split,
-            is_leaf=lambda x: isinstance(x, list),
-        )
+        all_labels: list[str] = []
+        all_terms: list[AbstractLoss] = []
+        all_weights: list[float] = []
+        # Tracks `all_labels`, for constant-time uniqueness checks.
+        seen_labels: set[str] = set()
 
-        # Start with the simple terms, if there are any.
-        if term_tuples_leaves[0] == []:
-            all_labels, all_terms, all_weights = (), (), ()
-        else:
-            all_labels, all_terms, all_weights = zip(*term_tuples_leaves[0])
+        def add_unique_label(label: str):
+            label = get_unique_label(label, seen_labels)
+            seen_labels.add(label)
+            all_labels.append(label)
 
-        # Make sure the simple term labels are unique.
-        for i, label in enumerate(all_labels):
-            label = get_unique_label(label, all_labels[:i])
-            all_labels = all_labels[:i] + (label,) + all_labels[i + 1 :]
+        # Start with the simple terms, making sure their labels are unique.
+        for label, term, weight in simple_terms:
+            add_unique_label(label)
+            all_terms.append(term)
+            all_weights.append(weight)
 
         # Flatten the composite terms, assuming they have the usual dict
         # attributes. We only need to flatten one level, because this `__init__`
         # (and the immutability of `eqx.Module`) ensures no deeper nestings
         # are ever constructed except through extreme hacks.
-        for group_label, composite_term, group_weight in term_tuples_leaves[1]:
+        for group_label, composite_term, group_weight in composite_terms:
             labels = composite_term.terms.keys()
 
             # If a unique label for the composite term is available, use it to
@@ -563,12 +595,11 @@ class CompositeLoss(AbstractTermedLoss):
 
             # Make sure the labels are unique.
             for label in labels:
-                label = get_unique_label(label, all_labels)
-                all_labels += (label,)
+                add_unique_label(label)
 
-            all_terms += tuple(composite_term.terms.values())
-            all_weights += tuple(
-                [group_weight * weight for weight in composite_term.weights.values()]
+            all_terms.extend(composite_term.terms.values())
+            all_weights.extend(
+                group_weight * weight for weight in composite_term.weights.values()
             )
 
         self.terms = dict(zip(all_labels, all_terms))
@@ -713,17 +744,55 @@ class TargetStateLoss(AbstractLoss):
             Euclidean distance between the actual and target positions.
         spec: Gives default/constant values for the substate target, discount, and
             time index.
+        task_spec_kind: How the task provides a target spec for this loss, if at all.
+            Usually left as `None` and set by
+            [`specialize`][feedbax.loss.TargetStateLoss.specialize].
     """
 
     label: str
     where: Callable
-    norm: Callable = lambda x: jnp.sum(x**2, axis=-1)
+    norm: Callable = lambda x: jnp.einsum("...i,...i->...", x, x)  # Squared distance
     # norm: Callable = lambda x: jnp.linalg.norm(x, axis=-1)  # Spatial distance
     spec: Optional[TargetSpec] = None  # Default/constant values.
+    key: str = field(static=True, init=False)
+    task_spec_kind: Optional[Literal["none", "spec", "mapping"]] = field(
+        default=None, static=True
+    )
+
+    def __post_init__(self):
+        # Parse `where` once, rather than whenever the module is reconstructed
+        self.key = WhereDict.key_transform(self.where)
+
+    def specialize(self, targets: Mapping[str, Any]) -> "TargetStateLoss":
+        """Return a copy of this loss whose target spec lookup is resolved in advance.
 
-    @cached_property
-    def key(self):
-        return WhereDict.key_transform(self.where)
+        Arguments:
+            targets: The `targets` of a representative `TaskTrialSpec`. Only its keys
+                and the types of its values are inspected, and these are the same for
+                every batch provided by a given task.
+        """
+        return replace(self, task_spec_kind=self._task_spec_kind(targets))
+
+    def _task_spec_kind(
+        self, targets: Mapping[str, Any]
+    ) -> Literal["none", "spec", "mapping"]:
+        kind = _task_spec_kind(targets, self.key)
+        if kind == "none" and self.spec is None:
+            raise ValueError(
+                "`TargetSpec` must be provided on construction of "
+                "`TargetStateLoss`, or as part of the trial "
+                "specifications"
+            )
+        return kind
+
+    def _target_spec(self, trial_specs: "TaskTrialSpec") -> TargetSpec:
+        """Combine the default spec with the one provided by the task, if any."""
+        kind = self.task_spec_kind
+        if kind is None:
+            kind = self._task_spec_kind(trial_specs.targets)
+        return _resolve_target_spec(
+            self.spec, trial_specs.targets, self.key, self.label, kind
+        )
 
     def term(
         self,
@@ -748,32 +817,13 @@ class TargetStateLoss(AbstractLoss):
         # TODO: Support PyTrees, not just single arrays
         state = self.where(states)[:, 1:]
 
-        if (task_target_spec := trial_specs.targets.get(self.key, None)) is None:
-            if self.spec is None:
-                raise ValueError(
-                    "`TargetSpec` must be provided on construction of "
-                    "`TargetStateLoss`, or as part of the trial "
-                    "specifications"
-                )
-
-            target_spec = self.spec
-        elif isinstance(task_target_spec, TargetSpec):
-            # Override default spec with trial-by-trial spec provided by the task, if any
-            target_spec: TargetSpec = eqx.combine(self.spec, task_target_spec)
-        elif isinstance(task_target_spec, Mapping):
-            target_spec: TargetSpec = eqx.combine(self.spec, task_target_spec[self.label])
-        else:
-            raise ValueError("Invalid target spec encountered ")
+        target_spec = self._target_spec(trial_specs)
 
         loss_over_time = self.norm(state - target_spec.value)
 
         # https://chatgpt.com/share/68ec227e-052c-8006-86ac-ffc5dc490b4d
 
-        time_mask = target_spec.time_mask
-        if time_mask is None:
-            time_mask = target_spec.get_time_mask(loss_over_time.shape[-1])
-
-        masks = [x for x in [time_mask, target_spec.discount] if x is not None]
+        masks = _target_spec_masks(target_spec, loss_over_time.shape[-1])
 
         # ? Should we keep the weights?
         return reduce_over_time_with_weights(
@@ -791,6 +841,48 @@ WeightsSpec = float | Array | Callable[[object], float | Array]
 # Callable takes a single trial's spec (PyTree leaf view) and returns scalar or (T,) weights
 
 
+def _task_spec_kind(
+    targets: Mapping[str, Any], key: str
+) -> Literal["none", "spec", "mapping"]:
+    """Return how `targets` provides a target spec for the state selected by `key`."""
+    task_target_spec = targets.get(key, None)
+    if task_target_spec is None:
+        return "none"
+    elif isinstance(task_target_spec, TargetSpec):
+        return "spec"
+    elif isinstance(task_target_spec, Mapping):
+        return "mapping"
+    else:
+        raise ValueError("Invalid target spec encountered ")
+
+
+def _resolve_target_spec(
+    spec: Optional[TargetSpec],
+    targets: Mapping[str, Any],
+    key: str,
+    label: str,
+    kind: Literal["none", "spec", "mapping"],
+) -> TargetSpec:
+    """Override the default `spec` with the one provided by the task, if any.
+
+    When the task provides a mapping of target specs, the one for `label` is used.
+    """
+    if kind == "none":
+        return spec
+    task_target_spec = targets[key]
+    if kind == "mapping":
+        task_target_spec = task_target_spec[label]
+    return eqx.combine(spec, task_target_spec)
+
+
+def _target_spec_masks(target_spec: TargetSpec, n_steps: int) -> list[WeightsSpec]:
+    """Return the time mask and discount of `target_spec`, where specified."""
+    time_mask = target_spec.time_mask
+    if time_mask is None:
+        time_mask = target_spec.get_time_mask(n_steps)
+    return [x for x in [time_mask, target_spec.discount] if x is not None]
+
+
 def _move_trial_axis_pytree(tree, trial_axis: int):
     def _move(x):
         if not isinstance(x, Array) or x.ndim < 2:
@@ -877,7 +969,6 @@ def reduce_over_time_with_weights(
     perm = _trial_time_perm(arr.ndim, trial_axis, time_axis)
     inv_perm = _inv_perm(perm)
     arr_rt = jnp.transpose(arr, perm)  # (N, ..., T)
-    specs_T0 = _move_trial_axis_pytree(trial_specs, trial_axis_specs)
 
     T = arr_rt.shape[-1]
     dtype = arr_rt.dtype
@@ -887,14 +978,19 @@ def reduce_over_time_with_weights(
     rest = arr_rt.shape[1:-1]
     arr_flat = arr_rt.reshape((N, -1, T))  # (N, R, T)
 
-    # Combine all masks/discounts/etc. as multiplicative weights
-    W = _combine_weights(masks, specs_T0, T, dtype)  # (N, T)
+    if not masks:
+        # Unweighted; skip building an all-ones weight array
+        reduced_flat = arr_flat.sum(axis=-1)  # (N, R)
+    else:
+        # Combine all masks/discounts/etc. as multiplicative weights
+        specs_T0 = _move_trial_axis_pytree(trial_specs, trial_axis_specs)
+        W = _combine_weights(masks, specs_T0, T, dtype)  # (N, T)
 
-    # Print the indices of the first zero entry in each row (trial) of the weights
-    # jax.debug.print("{a}\n{b}\n\n", a=label, b=jnp.argmax(W == 0, axis=1))
+        # Print the indices of the first zero entry in each row (trial) of the weights
+        # jax.debug.print("{a}\n{b}\n\n", a=label, b=jnp.argmax(W == 0, axis=1))
 
-    # Weighted reduction over time
-    reduced_flat = (arr_flat * W[:, None, :]).sum(axis=-1)  # (N, R)
+        # Weighted reduction over time, without materializing the weighted array
+        reduced_flat = jnp.einsum("nrt,nt->nr", arr_flat, W)  # (N, R)
     reduced = reduced_flat.reshape((N, *rest))  # (N, ...)
 
     # Restore the trial axis to its original slot in the *output* (time removed)
@@ -978,6 +1074,116 @@ class StopAtGoalLoss(AbstractLoss):
             raise ValueError("method must be 'softmin' or 'soft-or'")
 
 
+class EffectorFixationLoss(AbstractLoss):
+    """Penalizes the effector's squared distance from its target position, while
+    the hold signal is on.
+
+    !!! Note ""
+        Assumes that the task supplies a `hold` signal in its inputs, and a target
+        position sequence for `mechanics.effector.pos`, as `DelayedReaches` does.
+    """
+
+    label: str = "effector_fixation"
+
+    def term(
+        self,
+        states: Optional["SimpleFeedbackState"],
+        trial_specs: Optional["TaskTrialSpec"],
+        model: Optional[AbstractModel],
+    ) -> Array:
+        assert states is not None, "EffectorFixationLoss requires states"
+        assert trial_specs is not None, "EffectorFixationLoss requires trial_specs"
+
+        pos_diff = (
+            states.mechanics.effector.pos[:, 1:]
+            - trial_specs.targets["mechanics.effector.pos"].value
+        )
+        hold = jnp.squeeze(trial_specs.inputs.hold, axis=-1)  # [B, T]
+
+        # Masked sum of squared distances over space and time, in one contraction
+        return jnp.einsum("btd,btd,bt->b", pos_diff, pos_diff, hold)
+
+
+class KinematicDiscountedLoss(AbstractTermedLoss):
+    """Penalizes the effector's squared distances from its target position and
+    velocity, discounted over the trial.
+
+    This is equivalent to a `CompositeLoss` of one `TargetStateLoss` per kinematic
+    variable, each with the default (squared distance) `norm` and a default spec of
+    `TargetSpec(value=0.0, discount=power_discount(n_steps, discount_exp))`, but
+    evaluates all of the terms together, as a single contraction over one stacked
+    array of differences.
+
+    !!! Note ""
+        As for `TargetStateLoss`, any `TargetSpec` provided by the task for a
+        kinematic variable overrides the default spec, field by field. Where the
+        task provides a mapping of target specs, the one for each term is looked
+        up by its name (e.g. `"pos"`).
+
+    Attributes:
+        label: The label for the loss term.
+        kinds: The effector state variables to penalize, each of which becomes
+            a separately weighted term.
+        weights: Maps each of `kinds` to a term weight. Unspecified weights are 1.
+        discount_exp: The exponent of the power-law discount; see `power_discount`.
+    """
+
+    label: str = "effector_kinematics"
+    kinds: tuple[str, ...] = field(default=("pos", "vel"), static=True)
+    weights: dict[str, float] = field(default_factory=dict)
+    discount_exp: float = field(default=6, static=True)
+
+    @property
+    def terms(self) -> dict[str, str]:
+        """Maps each term to the `WhereDict` key of its state and target."""
+        return {kind: f"mechanics.effector.{kind}" for kind in self.kinds}
+
+    @jax.named_scope("fbx.KinematicDiscountedLoss")
+    def __call__(
+        self,
+        states: "SimpleFeedbackState",
+        trial_specs: "TaskTrialSpec",
+        model: Optional[AbstractModel] = None,
+    ) -> TermTree[AbstractLoss]:
+        effector = states.mechanics.effector
+        n_steps = getattr(effector, self.kinds[0]).shape[1] - 1
+        default_spec = TargetSpec(
+            value=jnp.array(0.0),
+            discount=power_discount(n_steps, self.discount_exp),
+        )
+
+        diffs, weights = [], []
+        for kind, key in self.terms.items():
+            target_spec = _resolve_target_spec(
+                default_spec,
+                trial_specs.targets,
+                key,
+                kind,
+                _task_spec_kind(trial_specs.targets, key),
+            )
+            diff = getattr(effector, kind)[:, 1:] - target_spec.value
+            diffs.append(diff)
+            weights.append(
+                _combine_weights(
+                    _target_spec_masks(target_spec, n_steps),
+                    trial_specs,
+                    n_steps,
+                    diff.dtype,
+                )
+            )
+        diffs = jnp.stack(jnp.broadcast_arrays(*diffs))  # [K, B, T, D]
+        weights = jnp.stack(jnp.broadcast_arrays(*weights))  # [K, B, T]
+
+        # Weighted sums of squared distances over time, for all kinds at once
+        values = jnp.einsum("kbtd,kbtd,kbt->kb", diffs, diffs, weights)
+
+        children = {
+            kind: TermTree.leaf(kind, value).with_weight(self.weights.get(kind, 1.0))
+            for kind, value in zip(self.kinds, values)
+        }
+        return TermTree.branch(self.label, children, originator=self)
+
+
 class ModelLoss(AbstractLoss):
     """Wrapper for functions that take a model, and return a scalar."""
 
@@ -1023,7 +1229,7 @@ class EffectorStraightPathLoss(AbstractLoss):
 
         effector_pos = states.mechanics.effector.pos
         pos_diff = jnp.diff(effector_pos, axis=1)
-        piecewise_lengths = jnp.linalg.norm(pos_diff, axis=-1)
+        piecewise_lengths = jnp.sqrt(jnp.einsum("btd,btd->bt", pos_diff, pos_diff))
         path_length = jnp.sum(piecewise_lengths, axis=1)
         if self.normalize_by == "actual":
             final_pos = effector_pos[:, -1]
@@ -1032,21 +1238,30 @@ class EffectorStraightPathLoss(AbstractLoss):
         else:
             raise ValueError("normalize_by must be 'actual' or 'goal'")
         init_final_diff = final_pos - effector_pos[:, 0]
-        straight_length = jnp.linalg.norm(init_final_diff, axis=-1)
+        straight_length = jnp.sqrt(jnp.einsum("bd,bd->b", init_final_diff, init_final_diff))
 
         loss = path_length / straight_length
 
         return loss
 
 
-def power_discount(n_steps: int, discount_exp: int = 6) -> Array:
+def power_discount(n_steps: int, discount_exp: float = 6) -> Array:
     """A power-law vector that puts most of the weight on its later elements.
 
+    The vector is computed once per `(n_steps, discount_exp)` on the host, so that
+    when this is called during tracing the result enters the graph as a constant.
+
     Arguments:
         n_steps: The number of time steps in the trajectory to be weighted.
         discount_exp: The exponent of the power law.
     """
+    return jnp.asarray(_power_discount(n_steps, discount_exp))
+
+
+@ft.lru_cache(maxsize=None)
+def _power_discount(n_steps: int, discount_exp: float) -> np.ndarray:
     if discount_exp == 0:
-        return jnp.array(1.0)
+        return np.array(1.0)
     else:
-        return jnp.linspace(1.0 / n_steps, 1.0, n_steps) ** discount_exp
+        # Exactly the grid `k / n_steps` for `k = 1, ..., n_steps`
+        return (np.arange(1, n_steps + 1) / n_steps) ** discount_exp
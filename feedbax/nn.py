@@ -8,7 +8,7 @@ import logging
 import math
 from collections import OrderedDict
 from collections.abc import Callable, Mapping, Sequence
-from functools import cached_property
+from functools import partial
 from typing import (
     Literal,
     Optional,
@@ -23,19 +23,23 @@ import equinox as eqx
 import jax
 import jax.numpy as jnp
 import jax.random as jr
+import jax.tree as jt
 from equinox import Module, field
-from jax.flatten_util import ravel_pytree
 from jaxtyping import Array, Float, PRNGKeyArray, PyTree
 
-from feedbax._model import wrap_stateless_callable, wrap_stateless_keyless_callable
+from feedbax._model import (
+    ModelInput,
+    wrap_stateless_callable,
+    wrap_stateless_keyless_callable,
+)
 from feedbax._staged import AbstractStagedModel, ModelStage
 from feedbax.intervene import AbstractIntervenor
 from feedbax.intervene.schedule import ArgIntervenors, ModelIntervenors
 from feedbax.misc import (
     identity_func,
-    interleave_unequal,
     n_positional_args,
 )
+from feedbax.nn_pallas import PALLAS_AVAILABLE, fused_two_layer
 from feedbax.state import StateT
 
 logger = logging.getLogger(__name__)
@@ -71,11 +75,12 @@ def orthogonal_gru_cell(
 ):
     """Returns an `eqx.nn.GRUCell` with orthogonal weight matrix initialization."""
     net = eqx.nn.GRUCell(input_size, hidden_size, use_bias=use_bias, key=key)
-    initializer = jax.nn.initializers.orthogonal(scale=scale, column_axis=-1)
-    ortho_weight_hh = jnp.concatenate(
-        [initializer(k, (hidden_size, hidden_size)) for k in jr.split(key, 3)],
-        axis=0,
-    )
+    # Orthogonalize the recurrent weights for all three gates with one batched QR.
+    # This gives the same weights as `jax.nn.initializers.orthogonal`, per gate.
+    gaussian = jax.vmap(lambda k: jr.normal(k, (hidden_size, hidden_size)))(jr.split(key, 3))
+    q, r = jnp.linalg.qr(gaussian)
+    q = q * jnp.sign(jnp.diagonal(r, axis1=-2, axis2=-1))[:, None, :]
+    ortho_weight_hh = scale * q.reshape(3 * hidden_size, hidden_size)
     net = eqx.tree_at(
         lambda net: net.weight_hh,
         net,
@@ -84,6 +89,20 @@ def orthogonal_gru_cell(
     return net
 
 
+def _ravel_leaves(tree: PyTree[Array]) -> Float[Array, "n"]:
+    """Flatten and concatenate the array leaves of a PyTree, into a single vector.
+
+    Gives the same result as `ravel_pytree(tree)[0]` for leaves of a common dtype,
+    but does not construct the inverse (unravel) function.
+    """
+    leaves = jt.leaves(tree)
+    if not leaves:
+        return jnp.zeros((0,))
+    elif len(leaves) == 1:
+        return jnp.ravel(leaves[0])
+    return jnp.concatenate([jnp.ravel(leaf) for leaf in leaves])
+
+
 class NetworkState(Module):
     """Type of state PyTree operated on by [`SimpleStagedNetwork`][feedbax.nn.SimpleStagedNetwork] instances.
 
@@ -99,6 +118,11 @@ class NetworkState(Module):
     encoding: Optional[PyTree[Array]] = None
 
 
+def _where_input_raveled(input: PyTree[Array], state: NetworkState) -> Array:
+    """Select the network inputs, flattened into a single vector."""
+    return _ravel_leaves(input)
+
+
 def contiguous_assignment(
     hidden_size: int,
     n_input_only: int,
@@ -126,15 +150,19 @@ def contiguous_assignment(
     Returns:
         Tuple of (input_only_indices, readout_only_indices, recurrent_only_indices, input_readout_indices).
     """
-    input_only_indices = jnp.arange(0, n_input_only)
-    readout_only_indices = jnp.arange(n_input_only, n_input_only + n_readout_only)
+    input_only_indices = jnp.arange(0, n_input_only, dtype=jnp.int32)
+    readout_only_indices = jnp.arange(
+        n_input_only, n_input_only + n_readout_only, dtype=jnp.int32
+    )
     recurrent_only_indices = jnp.arange(
         n_input_only + n_readout_only,
         n_input_only + n_readout_only + n_recurrent_only,
+        dtype=jnp.int32,
     )
     input_readout_indices = jnp.arange(
         n_input_only + n_readout_only + n_recurrent_only,
         hidden_size,
+        dtype=jnp.int32,
     )
     return input_only_indices, readout_only_indices, recurrent_only_indices, input_readout_indices
 
@@ -159,6 +187,9 @@ class PopulationStructure(Module):
         readout_only_indices: Indices of readout-only units.
         recurrent_only_indices: Indices of recurrent-only units.
         input_readout_indices: Indices of input-readout units.
+        is_input_unit: Boolean mask over hidden units, true for units receiving inputs.
+        is_readout_unit: Boolean mask over hidden units, true for units contributing
+            to readout.
     """
 
     n_input_only: int
@@ -167,13 +198,25 @@ class PopulationStructure(Module):
     n_input_readout: int
 
     # Indices for each population
-    input_indices: Array  # shape (n_input_only + n_input_readout,)
-    readout_indices: Array  # shape (n_readout_only + n_input_readout,)
     input_only_indices: Array  # shape (n_input_only,)
     readout_only_indices: Array  # shape (n_readout_only,)
     recurrent_only_indices: Array  # shape (n_recurrent_only,)
     input_readout_indices: Array  # shape (n_input_readout,)
 
+    # Membership masks, shared by all the layers masked with this structure
+    is_input_unit: Array  # shape (hidden_size,), bool
+    is_readout_unit: Array  # shape (hidden_size,), bool
+
+    @property
+    def input_indices(self) -> Array:
+        """Indices of all units receiving inputs (input-only + input-readout)."""
+        return jnp.concatenate([self.input_only_indices, self.input_readout_indices])
+
+    @property
+    def readout_indices(self) -> Array:
+        """Indices of all units contributing to readout (readout-only + input-readout)."""
+        return jnp.concatenate([self.readout_only_indices, self.input_readout_indices])
+
     @classmethod
     def create(
         cls,
@@ -214,9 +257,15 @@ class PopulationStructure(Module):
         elif total < hidden_size:
             n_input_readout += hidden_size - total
 
+        population_sizes = (n_input_only, n_readout_only, n_recurrent_only, n_input_readout)
+        if assignment_fn is None and sum(n > 0 for n in population_sizes) <= 1:
+            # All units are in one population, so a random assignment is the same as a
+            # contiguous one, up to the order of the indices, which does not matter.
+            assignment_fn = contiguous_assignment
+
         if assignment_fn is None:
             # Default: random assignment
-            all_indices = jr.permutation(key, hidden_size)
+            all_indices = jr.permutation(key, hidden_size).astype(jnp.int32)
             input_only_indices = all_indices[:n_input_only]
             readout_only_indices = all_indices[n_input_only : n_input_only + n_readout_only]
             recurrent_only_indices = all_indices[
@@ -234,37 +283,64 @@ class PopulationStructure(Module):
                 hidden_size, n_input_only, n_readout_only, n_recurrent_only, n_input_readout, key
             )
 
-        # Compute combined indices for input and readout
-        input_indices = jnp.concatenate([input_only_indices, input_readout_indices])
-        readout_indices = jnp.concatenate([readout_only_indices, input_readout_indices])
+        is_unit = jnp.zeros((hidden_size,), dtype=bool)
+        is_input_unit = is_unit.at[input_only_indices].set(True).at[input_readout_indices].set(True)
+        is_readout_unit = (
+            is_unit.at[readout_only_indices].set(True).at[input_readout_indices].set(True)
+        )
 
         return cls(
             n_input_only=n_input_only,
             n_readout_only=n_readout_only,
             n_recurrent_only=n_recurrent_only,
             n_input_readout=n_input_readout,
-            input_indices=input_indices,
-            readout_indices=readout_indices,
             input_only_indices=input_only_indices,
             readout_only_indices=readout_only_indices,
             recurrent_only_indices=recurrent_only_indices,
             input_readout_indices=input_readout_indices,
+            is_input_unit=is_input_unit,
+            is_readout_unit=is_readout_unit,
         )
 
 
+@jax.custom_vjp
+def _masked_weight(weight: Array, mask: Array) -> Array:
+    """Return `weight`, which is assumed to be masked already, but mask its gradient.
+
+    This keeps the structural zeros of `weight` in place through training,
+    without multiplying by `mask` on every forward pass.
+    """
+    return weight
+
+
+def _masked_weight_fwd(weight: Array, mask: Array):
+    return weight, mask
+
+
+def _masked_weight_bwd(mask: Array, grad: Array):
+    # The boolean mask has no cotangent
+    return jnp.where(mask, grad, 0), None
+
+
+_masked_weight.defvjp(_masked_weight_fwd, _masked_weight_bwd)
+
+
 class MaskedLinear(Module):
     """A linear layer with a fixed mask enforcing structural zeros.
 
-    This layer wraps an eqx.nn.Linear layer and applies a binary mask to enforce
-    that certain connections remain zero throughout training.
+    The mask is applied to the weights once, on construction. Thereafter the
+    gradients of the weights are masked, so that the structural zeros remain
+    zero throughout training.
 
     Attributes:
-        linear: The underlying linear layer.
-        mask: Binary mask applied to weights (1 = trainable, 0 = structural zero).
+        weight: The masked weight matrix.
+        bias: The bias vector, if any.
+        mask: Boolean mask applied to weights (True = trainable, False = structural zero).
     """
 
-    linear: eqx.nn.Linear
-    mask: Array  # shape matches linear.weight
+    weight: Array
+    bias: Optional[Array]
+    mask: Array  # boolean; broadcastable to the shape of weight
 
     def __init__(
         self,
@@ -280,40 +356,126 @@ class MaskedLinear(Module):
         Arguments:
             in_features: Number of input features.
             out_features: Number of output features.
-            mask: Binary mask of shape (out_features, in_features). 1 = trainable, 0 = always zero.
+            mask: Binary mask of shape (out_features, in_features), or broadcastable to
+                it. 1 = trainable, 0 = always zero. Stored as a boolean array.
             use_bias: Whether to include a bias term.
             key: Random key for weight initialization.
         """
-        self.linear = eqx.nn.Linear(in_features, out_features, use_bias=use_bias, key=key)
-        self.mask = mask
-
-    @property
-    def weight(self) -> Array:
-        """Access the underlying weight matrix for compatibility with eqx.nn.Linear interface."""
-        return self.linear.weight
-
-    @property
-    def bias(self) -> Optional[Array]:
-        """Access the underlying bias for compatibility with eqx.nn.Linear interface."""
-        return self.linear.bias
+        # Use the same initialization as `eqx.nn.Linear`
+        linear = eqx.nn.Linear(in_features, out_features, use_bias=use_bias, key=key)
+        self.mask = jnp.asarray(mask, dtype=bool)
+        self.weight = jnp.where(self.mask, linear.weight, 0)
+        self.bias = linear.bias
 
     def __call__(self, x: Array, *, key: Optional[PRNGKeyArray] = None) -> Array:
         """Apply the masked linear transformation.
 
-        The mask is applied on every forward pass to ensure structural zeros.
+        Arguments:
+            x: Input array.
+            key: Optional random key (unused, but required for compatibility).
+        """
+        result = _masked_weight(self.weight, self.mask) @ x
+        if self.bias is not None:
+            result = result + self.bias
+        return result
+
+
+def _quantize_int8(weight: Array) -> tuple[Array, Array]:
+    """Quantize weights to int8, with a max-abs scale for each row."""
+    scale = jnp.max(jnp.abs(weight), axis=-1) / 127
+    scale = jnp.where(scale > 0, scale, 1)
+    weight_int8 = jnp.round(weight / scale[..., None]).astype(jnp.int8)
+    return weight_int8, scale
+
+
+def _int8_matmul(weight_int8: Array, scale: Array, x: Array) -> Array:
+    """Multiply a vector by int8 weights, accumulating in int32.
+
+    The vector is quantized to int8 on the fly, with a single max-abs scale.
+    """
+    x_scale = jnp.max(jnp.abs(x)) / 127
+    x_scale = jnp.where(x_scale > 0, x_scale, 1)
+    x_int8 = jnp.round(x / x_scale).astype(jnp.int8)
+    y = jax.lax.dot_general(
+        weight_int8,
+        x_int8,
+        (((weight_int8.ndim - 1,), (0,)), ((), ())),
+        preferred_element_type=jnp.int32,
+    )
+    # Combine the scales first, so the result is only rescaled once
+    return y.astype(scale.dtype) * (scale * x_scale)
+
+
+class QuantizedLinear(Module):
+    """A linear layer with int8 weights, for inference.
+
+    Weights are quantized with a scale for each output, and inputs with a single
+    scale computed on each call. The matmul is performed in int8, accumulating in
+    int32, which halves the memory traffic for the weights relative to bfloat16,
+    and allows int8 dot product instructions to be used where available.
+
+    Attributes:
+        weight: The quantized weight matrix.
+        scale: The scale of each row of the weight matrix.
+        bias: The bias vector, if any.
+    """
+
+    weight: Array
+    scale: Array
+    bias: Optional[Array]
+
+    def __init__(self, weight: Array, bias: Optional[Array] = None):
+        """Quantize the weights of a trained linear layer.
+
+        Arguments:
+            weight: The floating point weight matrix, with shape
+                `(out_features, in_features)`.
+            bias: The bias vector, if any. Not quantized.
+        """
+        self.weight, self.scale = _quantize_int8(weight)
+        self.bias = bias
+
+    def __call__(self, x: Array, *, key: Optional[PRNGKeyArray] = None) -> Array:
+        """Apply the quantized linear transformation.
 
         Arguments:
             x: Input array.
             key: Optional random key (unused, but required for compatibility).
         """
-        # Apply mask to weights before computation
-        masked_weight = self.linear.weight * self.mask
-        result = jnp.dot(x, masked_weight.T)
-        if self.linear.bias is not None:
-            result = result + self.linear.bias
+        result = _int8_matmul(self.weight, self.scale, x)
+        if self.bias is not None:
+            result = result + self.bias
         return result
 
 
+def _mask_input_weights(hidden: Module, hidden_size: int, row_mask: Array) -> Module:
+    """Zero the input weights of a hidden layer, except those onto units in `row_mask`.
+
+    The input weights and number of gates of registered cell types are given by
+    `_RNN_CELL_SPECS`. Other layers are inspected for a `weight_ih`, and returned
+    unchanged if they have none.
+    """
+    if (cell_spec := _RNN_CELL_SPECS.get(type(hidden))) is not None:
+        weight_attr, n_gates = cell_spec
+    elif hasattr(hidden, "weight_ih"):
+        weight_attr, n_gates = "weight_ih", hidden.weight_ih.shape[0] // hidden_size
+    else:
+        return hidden
+
+    # Only input-receiving units get non-zero rows. The mask selects whole rows,
+    # so it is a boolean vector that is broadcast over the columns, and over the
+    # gates (e.g. reset, update, candidate for `GRUCell`), rather than tiled.
+    weight_ih = getattr(hidden, weight_attr)
+    if weight_ih is None:
+        return hidden
+    masked_weight_ih = jnp.where(
+        row_mask[None, :, None],
+        weight_ih.reshape(n_gates, hidden_size, -1),
+        0,
+    ).reshape(weight_ih.shape)
+    return eqx.tree_at(lambda h: getattr(h, weight_attr), hidden, masked_weight_ih)
+
+
 class SimpleStagedNetwork(AbstractStagedModel[NetworkState]):
     """A single step of a neural network layer, with optional encoder and readout layers.
 
@@ -326,6 +488,8 @@ class SimpleStagedNetwork(AbstractStagedModel[NetworkState]):
         hidden_nonlinearity: The nonlinearity applied to the hidden layer output.
         encoder: The module implementing the encoder layer, if present.
         readout: The module implementing the readout layer, if present.
+        hidden_is_stateful: Whether the hidden layer takes the prior hidden state as
+            an argument, e.g. as an RNN cell does.
     """
 
     input_size: int
@@ -339,6 +503,7 @@ class SimpleStagedNetwork(AbstractStagedModel[NetworkState]):
     encoding_size: Optional[int] = None
     encoder: Optional[Module] = None
     population_structure: Optional[PopulationStructure] = None
+    hidden_is_stateful: bool = field(static=True, init=False)
 
     intervenors: ModelIntervenors[NetworkState]
 
@@ -412,96 +577,42 @@ class SimpleStagedNetwork(AbstractStagedModel[NetworkState]):
         self.input_size = input_size
         self.population_structure = population_structure
 
-        # Create encoder layer (potentially masked if population_structure is provided)
+        # Create encoder layer
         if encoding_size is not None:
-            if population_structure is not None:
-                # Create mask for encoder: only input-receiving units get non-zero columns
-                encoder_mask = jnp.zeros((encoding_size, input_size))
-                # For simplicity, allow all encoder units to receive all inputs
-                # The masking will happen at the encoder->hidden connection instead
-                encoder_mask = jnp.ones((encoding_size, input_size))
-                self.encoder = MaskedLinear(
-                    input_size, encoding_size, encoder_mask, use_bias=use_bias, key=key2
-                )
-            else:
-                self.encoder = encoder_type(input_size, encoding_size, key=key2)
+            # All encoder units receive all inputs, even if there is a population
+            # structure; the masking happens at the encoder->hidden connection instead
+            self.encoder = encoder_type(input_size, encoding_size, key=key2)
             self.encoding_size = encoding_size
-
-            # Create hidden layer - if we have population structure, we need to mask
-            # the connection from encoder to hidden
-            if population_structure is not None:
-                # For RNN cells like GRUCell, we need to mask the input weights
-                # Create the hidden layer first, then mask its input weights
-                hidden = hidden_type(encoding_size, hidden_size, use_bias=use_bias, key=key1)
-
-                # Mask the input->hidden weights (weight_ih for GRU/RNN)
-                if hasattr(hidden, "weight_ih"):
-                    # For GRUCell, weight_ih is (3*hidden_size, input_size) for reset, update, candidate
-                    weight_ih_shape = hidden.weight_ih.shape
-
-                    # Create mask: only input-receiving units get non-zero rows
-                    if weight_ih_shape[0] == 3 * hidden_size:
-                        # GRUCell case: replicate mask 3 times (for reset, update, candidate)
-                        hidden_input_mask = jnp.zeros((hidden_size, encoding_size))
-                        hidden_input_mask = hidden_input_mask.at[
-                            population_structure.input_indices, :
-                        ].set(1.0)
-                        hidden_input_mask = jnp.tile(hidden_input_mask, (3, 1))
-                    else:
-                        # Simple RNN case
-                        hidden_input_mask = jnp.zeros((hidden_size, encoding_size))
-                        hidden_input_mask = hidden_input_mask.at[
-                            population_structure.input_indices, :
-                        ].set(1.0)
-
-                    masked_weight_ih = hidden.weight_ih * hidden_input_mask
-                    hidden = eqx.tree_at(lambda h: h.weight_ih, hidden, masked_weight_ih)
-
-                self.hidden = hidden
-            else:
-                self.hidden = hidden_type(encoding_size, hidden_size, use_bias=use_bias, key=key1)
+            hidden_input_size = encoding_size
         else:
             # No encoder - input goes directly to hidden layer
-            if population_structure is not None:
-                hidden = hidden_type(input_size, hidden_size, use_bias=use_bias, key=key1)
-
-                # Mask the input->hidden weights
-                if hasattr(hidden, "weight_ih"):
-                    # For GRUCell, weight_ih is (3*hidden_size, input_size) for reset, update, candidate
-                    weight_ih_shape = hidden.weight_ih.shape
-
-                    # Create mask: only input-receiving units get non-zero rows
-                    if weight_ih_shape[0] == 3 * hidden_size:
-                        # GRUCell case: replicate mask 3 times (for reset, update, candidate)
-                        hidden_input_mask = jnp.zeros((hidden_size, input_size))
-                        hidden_input_mask = hidden_input_mask.at[
-                            population_structure.input_indices, :
-                        ].set(1.0)
-                        hidden_input_mask = jnp.tile(hidden_input_mask, (3, 1))
-                    else:
-                        # Simple RNN case
-                        hidden_input_mask = jnp.zeros((hidden_size, input_size))
-                        hidden_input_mask = hidden_input_mask.at[
-                            population_structure.input_indices, :
-                        ].set(1.0)
-
-                    masked_weight_ih = hidden.weight_ih * hidden_input_mask
-                    hidden = eqx.tree_at(lambda h: h.weight_ih, hidden, masked_weight_ih)
-
-                self.hidden = hidden
-            else:
-                self.hidden = hidden_type(input_size, hidden_size, use_bias=use_bias, key=key1)
+            hidden_input_size = input_size
+
+        hidden = hidden_type(hidden_input_size, hidden_size, use_bias=use_bias, key=key1)
+        if population_structure is not None:
+            # Mask the input->hidden weights (e.g. from the encoder, if there is one)
+            hidden = _mask_input_weights(hidden, hidden_size, population_structure.is_input_unit)
+        self.hidden = hidden
 
         self.hidden_size = hidden_size
         self.hidden_nonlinearity = hidden_nonlinearity
+
+        # Stateful layers (e.g. RNN cells) take 2 positional arguments, and stateless
+        # layers only 1. Inspect the signature once, rather than in `model_spec`.
+        self.hidden_is_stateful = n_positional_args(self.hidden) != 1  # type: ignore
+        if not self.hidden_is_stateful and isinstance(self.hidden, eqx.nn.Linear):
+            if hidden_nonlinearity is identity_func:
+                logger.warning(
+                    "Network hidden layer is linear but no hidden nonlinearity is defined"
+                )
         self.hidden_noise_std = hidden_noise_std
 
         # Create readout layer (potentially masked if population_structure is provided)
         if out_size is not None:
             if population_structure is not None:
-                # Create mask for readout: only readout-contributing units have non-zero columns
-                readout_mask = jnp.zeros((out_size, hidden_size))
-                readout_mask = readout_mask.at[:, population_structure.readout_indices].set(1.0)
+                # Create mask for readout: only readout-contributing units have non-zero
+                # columns. The mask is broadcast over the rows.
+                readout_mask = population_structure.is_readout_unit[None, :]
                 readout = MaskedLinear(
                     hidden_size, out_size, readout_mask, use_bias=use_bias, key=key3
                 )
@@ -509,20 +620,11 @@ class SimpleStagedNetwork(AbstractStagedModel[NetworkState]):
                 readout = readout_type(hidden_size, out_size, key=key3)
 
             if (bias := getattr(readout, "bias", None)) is not None:
-                if isinstance(readout, MaskedLinear):
-                    #! Is this necessary? Or can we just tree_at `layer.bias` since it is a property
-                    #! that points to `layer.linear.bias`?
-                    readout = eqx.tree_at(
-                        lambda layer: layer.linear.bias,
-                        readout,
-                        jnp.zeros_like(bias),
-                    )
-                else:
-                    readout = eqx.tree_at(
-                        lambda layer: layer.bias,
-                        readout,
-                        jnp.zeros_like(bias),
-                    )
+                readout = eqx.tree_at(
+                    lambda layer: layer.bias,
+                    readout,
+                    jnp.zeros_like(bias),
+                )
             self.readout = readout
             self.out_nonlinearity = out_nonlinearity
             self.out_size = out_size
@@ -534,7 +636,11 @@ class SimpleStagedNetwork(AbstractStagedModel[NetworkState]):
     def _add_hidden_noise(self, input, state, *, key):
         if self.hidden_noise_std is None:
             return state
-        return state + self.hidden_noise_std * jr.normal(key, state.shape)
+        return state + self._hidden_noise(state, key)
+
+    def _hidden_noise(self, state: Array, key: PRNGKeyArray) -> Array:
+        # Sample in the dtype of the state, to avoid promoting low-precision states
+        return jr.normal(key, state.shape, dtype=state.dtype) * self.hidden_noise_std
 
     @property
     def model_spec(self) -> OrderedDict[str, ModelStage[Self, NetworkState]]:
@@ -545,20 +651,16 @@ class SimpleStagedNetwork(AbstractStagedModel[NetworkState]):
         construction.
 
         !!! NOTE
-            Inspects the instantiated hidden layer to determine if it is a stateful
-            network (e.g. an RNN). If not (e.g. Linear), it wraps the layer so that
+            On construction, the hidden layer is inspected to determine if it is a
+            stateful network (e.g. an RNN). If not (e.g. Linear), it is wrapped so that
             it plays well with the state-passing of `AbstractStagedModel`. This assumes
             that stateful layers will take 2 positional arguments, and stateless layers
             only 1.
         """
         Stage = ModelStage[Self, NetworkState]
 
-        if n_positional_args(self.hidden) == 1:  # type: ignore
+        if not self.hidden_is_stateful:
             hidden_module = lambda self: wrap_stateless_callable(self.hidden)
-            if isinstance(self.hidden, eqx.nn.Linear):
-                logger.warning(
-                    "Network hidden layer is linear but no hidden nonlinearity is defined"
-                )
         else:
             # #TODO: revert this!
             # def tmp(self):
@@ -573,7 +675,7 @@ class SimpleStagedNetwork(AbstractStagedModel[NetworkState]):
                 # Store the flattened network inputs as part of `NetworkState`
                 "input": Stage(
                     callable=lambda self: lambda input, state, *, key: input,
-                    where_input=lambda input, _: ravel_pytree(input)[0],
+                    where_input=_where_input_raveled,
                     where_state=lambda state: state.input,
                 ),
             }
@@ -605,10 +707,11 @@ class SimpleStagedNetwork(AbstractStagedModel[NetworkState]):
                 }
             )
 
-        # TODO: conditional on `self.hidden_nonlinearity is not identity_func`?
         spec |= {
             "hidden_nonlinearity": Stage(
-                callable=lambda self: wrap_stateless_keyless_callable(self.hidden_nonlinearity),
+                callable=lambda self: wrap_stateless_keyless_callable(
+                    self.hidden_nonlinearity
+                ),
                 where_input=lambda input, state: state.hidden,
                 where_state=lambda state: state.hidden,
             ),
@@ -642,6 +745,52 @@ class SimpleStagedNetwork(AbstractStagedModel[NetworkState]):
 
         return spec
 
+    @classmethod
+    def scan_layers(
+        cls,
+        layers: "SimpleStagedNetwork",
+        input_: ModelInput,
+        states: NetworkState,
+        *,
+        key: PRNGKeyArray,
+    ) -> NetworkState:
+        """Step a stack of networks, where each network takes the output of the last.
+
+        The stack is iterated with `jax.lax.scan`, so a single network step is traced
+        and compiled, no matter the number of networks.
+
+        !!! Note ""
+            All of the networks must have the same structure. The array leaves of
+            `layers` and `states` have a leading layer axis, for example when the
+            networks are constructed with `eqx.filter_vmap`. Since each network's
+            output is the next network's input, `out_size` must equal `input_size`.
+
+        Arguments:
+            layers: The stacked networks.
+            input_: The input to the first network. The intervention parameters
+                are passed unchanged to every network.
+            states: The stacked prior states of the networks.
+            key: A random key, which is split between the networks.
+
+        Returns:
+            The stacked, updated states of the networks.
+        """
+        layers_dynamic, layers_static = eqx.partition(layers, eqx.is_array)
+        n_layers = jt.leaves(layers_dynamic)[0].shape[0]
+
+        def step(layer_input, xs):
+            layer_dynamic, state, key = xs
+            layer = eqx.combine(layer_dynamic, layers_static)
+            state = layer(ModelInput(layer_input, input_.intervene), state, key)
+            return state.output, state
+
+        _, states = jax.lax.scan(
+            step,
+            _ravel_leaves(input_.value),
+            (layers_dynamic, states, jr.split(key, n_layers)),
+        )
+        return states
+
     @property
     def memory_spec(self) -> PyTree[bool]:
         return NetworkState(
@@ -683,15 +832,14 @@ class LeakyRNNCell(Module):
     """
 
     weight_hh: Array
-    weight_ih: Array
+    weight_ih: Optional[Array]  # `None` if the cell has no inputs
     bias: Optional[Array]
     input_size: int
     hidden_size: int
     use_bias: bool
     use_noise: bool
-    noise_strength: float
-    dt: float
-    tau: float
+    alpha: float  # dt / tau
+    noise_std: Optional[float]
     nonlinearity: Callable
 
     @jax.named_scope("fbx.RNNCell")
@@ -720,7 +868,7 @@ class LeakyRNNCell(Module):
                 maxval=lim,
             )
         else:
-            self.weight_ih = jnp.array(0)
+            self.weight_ih = None
 
         self.weight_hh = jr.uniform(
             hhkey,
@@ -743,9 +891,11 @@ class LeakyRNNCell(Module):
         self.hidden_size = hidden_size
         self.use_bias = use_bias
         self.use_noise = use_noise
-        self.noise_strength = noise_strength
-        self.dt = dt
-        self.tau = tau
+        self.alpha = dt / tau
+        if use_noise:
+            self.noise_std = math.sqrt(2 / self.alpha) * noise_strength
+        else:
+            self.noise_std = None
         self.nonlinearity = nonlinearity
 
     def __call__(self, input: Array, state: Array, key: PRNGKeyArray):
@@ -756,26 +906,347 @@ class LeakyRNNCell(Module):
             bias = 0
 
         if self.use_noise:
-            noise = self.noise_std * jr.normal(key, state.shape)
+            noise = jr.normal(key, state.shape, dtype=state.dtype) * self.noise_std
         else:
             noise = 0
 
-        state = (1 - self.alpha) * state + self.alpha * self.nonlinearity(
-            jnp.dot(self.weight_ih, input) + jnp.dot(self.weight_hh, state) + bias + noise
-        )
+        preactivation = jnp.dot(self.weight_hh, state) + bias + noise
+        if self.weight_ih is not None:
+            preactivation = preactivation + jnp.dot(self.weight_ih, input)
+
+        state = (1 - self.alpha) * state + self.alpha * self.nonlinearity(preactivation)
 
         return state  #! 0D PyTree
 
-    @cached_property
-    def alpha(self):
-        return self.dt / self.tau
 
-    @cached_property  # type: ignore
-    def noise_std(self, noise_strength):
-        if self.use_noise:
-            return math.sqrt(2 / self.alpha) * noise_strength
+# Maps hidden cell types to the name of their input weight matrix, and the number
+# of gates whose input weights are stacked in it.
+_RNN_CELL_SPECS: dict[type, tuple[str, int]] = {
+    eqx.nn.GRUCell: ("weight_ih", 3),
+    eqx.nn.LSTMCell: ("weight_ih", 4),
+    LeakyRNNCell: ("weight_ih", 1),
+}
+
+
+def _init_linear(
+    in_features: int, out_features: int, *, key: PRNGKeyArray
+) -> tuple[Array, Array]:
+    """Return a weight and bias with the same initialization as `eqx.nn.Linear`."""
+    wkey, bkey = jr.split(key)
+    lim = 1 / math.sqrt(in_features)
+    weight = jr.uniform(wkey, (out_features, in_features), minval=-lim, maxval=lim)
+    bias = jr.uniform(bkey, (out_features,), minval=-lim, maxval=lim)
+    return weight, bias
+
+
+class NLayerLinear(Module):
+    """A stack of linear layers, with a nonlinearity after all but the last.
+
+    Equivalent to an `eqx.nn.Sequential` of alternating `eqx.nn.Linear` layers and
+    nonlinearities, but the weights are stored directly and applied in a single
+    loop, so that tracing produces one matmul (plus bias and nonlinearity) per
+    layer without the overhead of the wrapper modules. With
+    `checkpoint_layers=True`, each interior (hidden-to-hidden) layer is wrapped in
+    `jax.checkpoint`, so that its activity is recomputed during backpropagation
+    rather than stored, which saves memory for deep networks.
+
+    If constructed with `stacked=True`, the interior layers are stored as a single
+    array of shape `(L, H, H)`, and applied with `jax.lax.fori_loop`, so that they
+    are only traced once, and their activity is carried in a single buffer. For an
+    ensemble of stacked networks (see `batched_apply`) each interior layer is then a
+    single batched matmul over the ensemble.
+
+    If constructed with `use_pallas=True`, a network with a single hidden layer and
+    biases is applied as one fused Pallas kernel, which keeps the hidden activity
+    on-chip between the two matmuls. The kernel has no autodiff rule, so this is
+    only suitable for inference. On the CPU, which has no Pallas lowering, the
+    kernel runs in the Pallas interpreter, which is much slower than the usual
+    computation; see `feedbax.nn_pallas.fused_two_layer`. Networks with other
+    structures fall back to the usual computation.
+
+    The weights can be stored in a narrower floating point type such as
+    `jnp.bfloat16`, by passing `dtype`. Inputs to each layer are cast to the type of
+    its weights, while products are accumulated in (at least) float32, and the
+    output has the same type as the input. For inference, the weights can also be
+    quantized to int8 with `quantize_int8`; see `QuantizedLinear`.
+
+    Attributes:
+        weights: The weight matrix of each layer, with shape `(out, in)`. If
+            `stacked_weight` is not `None`, only the first and last layers.
+        biases: The bias vector of each layer in `weights`, or `None` if there are no
+            biases.
+        stacked_weight: The weight matrices of the interior layers, with shape
+            `(L, H, H)`, or `None` if the interior layers are stored in `weights`.
+        stacked_bias: The bias vectors of the interior layers, with shape `(L, H)`,
+            or `None`.
+        weight_scales: The row scales of each int8 weight matrix in `weights`, or
+            `None` if the weights are not quantized.
+        stacked_weight_scale: The row scales of the int8 `stacked_weight`, or `None`.
+        nonlinearity: The nonlinearity applied to the output of each hidden layer.
+        use_pallas: Whether to apply two-layer networks with a fused Pallas kernel.
+        checkpoint_layers: Whether to rematerialize the activities of the interior
+            layers during backpropagation.
+    """
+
+    weights: tuple[Array, ...]
+    biases: Optional[tuple[Array, ...]]
+    stacked_weight: Optional[Array]
+    stacked_bias: Optional[Array]
+    weight_scales: Optional[tuple[Array, ...]]
+    stacked_weight_scale: Optional[Array]
+    nonlinearity: Callable[[Float], Float] = field(static=True)
+    use_pallas: bool = field(static=True)
+    checkpoint_layers: bool = field(static=True)
+
+    def __init__(
+        self,
+        sizes: Sequence[int],
+        use_bias: bool = True,
+        nonlinearity: Callable[[Float], Float] = jnp.tanh,
+        stacked: bool = False,
+        use_pallas: bool = False,
+        dtype: Optional[jnp.dtype] = None,
+        checkpoint_layers: bool = False,
+        *,
+        key: PRNGKeyArray,
+    ):
+        """
+        Arguments:
+            sizes: The sizes of the input, the hidden layers, and the output, in order.
+            use_bias: Whether the layers have biases.
+            nonlinearity: The nonlinearity applied to the output of each hidden layer.
+            stacked: Whether to store the interior layers as a single array. Requires
+                at least two hidden layers, all of the same size.
+            use_pallas: Whether to apply two-layer networks with a fused Pallas
+                kernel. Only for inference.
+            dtype: The type of the weights and biases. Defaults to float32.
+            checkpoint_layers: Whether to rematerialize the activities of the
+                interior layers during backpropagation.
+            key: Random key for weight initialization.
+        """
+        n_layers = len(sizes) - 1
+        hidden_sizes = sizes[1:-1]
+        equal_interior = len(hidden_sizes) >= 2 and len(set(hidden_sizes)) == 1
+        if stacked and not equal_interior:
+            raise ValueError(
+                "`stacked=True` requires at least two hidden layers of equal size"
+            )
+
+        if equal_interior:
+            # Initialize the interior layers with one batched draw, into contiguous
+            # arrays; the keys are the same as when initializing layer by layer
+            interior_keys = jax.vmap(partial(jr.fold_in, key))(
+                jnp.arange(1, n_layers - 1)
+            )
+            interior_weight, interior_bias = jax.vmap(
+                lambda layer_key: _init_linear(
+                    hidden_sizes[0], hidden_sizes[0], key=layer_key
+                )
+            )(interior_keys)
+            (first_weight, first_bias), (last_weight, last_bias) = (
+                _init_linear(sizes[i], sizes[i + 1], key=jr.fold_in(key, i))
+                for i in (0, n_layers - 1)
+            )
+        else:
+            weights, biases = zip(*(
+                _init_linear(size_in, size_out, key=jr.fold_in(key, i))
+                for i, (size_in, size_out) in enumerate(zip(sizes[:-1], sizes[1:]))
+            ))
+
+        if stacked:
+            stacked_weight, stacked_bias = interior_weight, interior_bias
+            weights, biases = (first_weight, last_weight), (first_bias, last_bias)
+        else:
+            stacked_weight, stacked_bias = None, None
+            if equal_interior:
+                weights = (first_weight, *interior_weight, last_weight)
+                biases = (first_bias, *interior_bias, last_bias)
+
+        if dtype is not None:
+            weights, biases, stacked_weight, stacked_bias = jt.map(
+                lambda array: array.astype(dtype),
+                (weights, biases, stacked_weight, stacked_bias),
+            )
+
+        self.weights = weights
+        self.biases = biases if use_bias else None
+        self.stacked_weight = stacked_weight
+        self.stacked_bias = stacked_bias if use_bias else None
+        self.weight_scales = None
+        self.stacked_weight_scale = None
+        self.nonlinearity = nonlinearity
+
+        if use_pallas and not PALLAS_AVAILABLE:
+            logger.warning("Pallas is not available; `use_pallas` will be ignored")
+        self.use_pallas = use_pallas and PALLAS_AVAILABLE
+        self.checkpoint_layers = checkpoint_layers
+
+    @property
+    def in_features(self) -> int:
+        """The size of the input."""
+        return self.weights[0].shape[-1]
+
+    @property
+    def out_features(self) -> int:
+        """The size of the output."""
+        return self.weights[-1].shape[-2]
+
+    def _layer(
+        self, weight: Array, scale: Optional[Array], bias: Optional[Array], x: Array
+    ) -> Array:
+        if scale is None:
+            y = jnp.matmul(
+                weight,
+                x.astype(weight.dtype),
+                preferred_element_type=jnp.promote_types(x.dtype, jnp.float32),
+            )
         else:
-            return None
+            y = _int8_matmul(weight, scale, x)
+        if bias is not None:
+            y = y + bias
+        return y
+
+    def _loop_layers(
+        self,
+        weights: Array,
+        scales: Optional[Array],
+        biases: Optional[Array],
+        x: Array,
+    ) -> Array:
+        # The activity is carried in a single buffer, updated in place by each layer
+        def body(i, x):
+            layer = jt.map(lambda array: array[i], (weights, scales, biases))
+            return self.nonlinearity(self._layer(*layer, x))
+
+        if self.checkpoint_layers:
+            body = jax.checkpoint(body)
+
+        return jax.lax.fori_loop(0, weights.shape[0], body, x)
+
+    def __call__(self, x: Array, *, key: Optional[PRNGKeyArray] = None) -> Array:
+        """Apply the layers in sequence.
+
+        Arguments:
+            x: Input array.
+            key: Optional random key (unused, but required for compatibility).
+        """
+        if (
+            self.use_pallas
+            and len(self.weights) == 2
+            and self.biases is not None
+            and self.stacked_weight is None
+            and self.weight_scales is None
+            and x.ndim == 1
+        ):
+            (w1, w2), (b1, b2) = self.weights, self.biases
+            y = fused_two_layer(x[None], w1, b1, w2, b2, nonlinearity=self.nonlinearity)
+            return y[0]
+
+        out_dtype = x.dtype
+        no_arrays = (None,) * len(self.weights)
+        layers = list(zip(
+            self.weights,
+            self.weight_scales if self.weight_scales is not None else no_arrays,
+            self.biases if self.biases is not None else no_arrays,
+        ))
+
+        if self.stacked_weight is not None:
+            x = self.nonlinearity(self._layer(*layers[0], x))
+            x = self._loop_layers(
+                self.stacked_weight, self.stacked_weight_scale, self.stacked_bias, x
+            )
+            return self._layer(*layers[-1], x).astype(out_dtype)
+
+        def hidden_layer(layer, x):
+            return self.nonlinearity(self._layer(*layer, x))
+
+        if self.checkpoint_layers:
+            interior_layer = jax.checkpoint(hidden_layer)
+        else:
+            interior_layer = hidden_layer
+
+        for i, layer in enumerate(layers[:-1]):
+            x = (interior_layer if i > 0 else hidden_layer)(layer, x)
+
+        return self._layer(*layers[-1], x).astype(out_dtype)
+
+    def quantize_int8(self) -> Self:
+        """Return a copy of the network with its weights quantized to int8.
+
+        See `QuantizedLinear`. Only suitable for inference, after training.
+        """
+        if self.weight_scales is not None:
+            return self
+        weights, scales = zip(*map(_quantize_int8, self.weights))
+        if self.stacked_weight is not None:
+            stacked_weight, stacked_scale = _quantize_int8(self.stacked_weight)
+        else:
+            stacked_weight, stacked_scale = None, None
+        return eqx.tree_at(
+            lambda net: (
+                net.weights,
+                net.weight_scales,
+                net.stacked_weight,
+                net.stacked_weight_scale,
+            ),
+            self,
+            (weights, scales, stacked_weight, stacked_scale),
+            is_leaf=lambda x: x is None,
+        )
+
+    def aot_compile(
+        self,
+        example_x: Array | jax.ShapeDtypeStruct,
+        cache: Optional[dict] = None,
+    ) -> Callable[[Array], Array]:
+        """Compile the network ahead of time, for inputs like `example_x`.
+
+        Arguments:
+            example_x: An example input, or a `jax.ShapeDtypeStruct` describing one.
+            cache: A dict in which to store the compiled executable, keyed on the
+                structure of the network and the shapes and dtypes of its parameters
+                and input. If given, networks that differ only in the values of
+                their parameters share an executable, which lives as long as `cache`.
+                Otherwise, the network is compiled on every call.
+
+        Returns:
+            A function that applies the compiled network to an input with the same
+            shape and dtype as `example_x`.
+        """
+        dynamic, static = eqx.partition(self, eqx.is_array)
+        cache_key = (
+            static,
+            jt.map(lambda array: jax.ShapeDtypeStruct(array.shape, array.dtype), dynamic),
+            jax.ShapeDtypeStruct(tuple(example_x.shape), jnp.dtype(example_x.dtype)),
+        )
+        if cache is None:
+            compiled = _compile_forward(*cache_key)
+        elif (compiled := cache.get(cache_key)) is None:
+            compiled = cache[cache_key] = _compile_forward(*cache_key)
+        return partial(compiled, dynamic)
+
+    @staticmethod
+    def batched_apply(models: "NLayerLinear", xs: Array) -> Array:
+        """Apply an ensemble of networks to a batch of inputs, one input per network.
+
+        Arguments:
+            models: Networks whose array leaves have a leading ensemble dimension,
+                for example as constructed by `feedbax.get_ensemble`.
+            xs: Inputs with the same leading ensemble dimension.
+        """
+        return eqx.filter_vmap(lambda model, x: model(x))(models, xs)
+
+
+def _compile_forward(
+    static: NLayerLinear,
+    dynamic_spec: PyTree[jax.ShapeDtypeStruct],
+    x_spec: jax.ShapeDtypeStruct,
+):
+    return (
+        jax.jit(lambda dynamic, x: eqx.combine(dynamic, static)(x))
+        .lower(dynamic_spec, x_spec)
+        .compile()
+    )
 
 
 def n_layer_linear(
@@ -784,21 +1255,49 @@ def n_layer_linear(
     out_size: int,
     use_bias: bool = True,
     nonlinearity: Callable[[Float], Float] = jnp.tanh,
+    stacked: bool = False,
+    use_pallas: bool = False,
+    quantize: Optional[Literal["int8"]] = None,
+    dtype: Optional[jnp.dtype] = None,
+    checkpoint_layers: bool = False,
     *,
     key,
 ):
-    """A simple n-layer linear network with nonlinearity."""
-    keys = jr.split(key, len(hidden_sizes) + 1)
-    sizes = (input_size,) + tuple(hidden_sizes) + (out_size,)
-    layers = [
-        eqx.nn.Linear(size0, size1, use_bias=use_bias, key=keys[i])
-        for i, (size0, size1) in enumerate(zip(sizes[:-1], sizes[1:]))
-    ]
-    return eqx.nn.Sequential(list(interleave_unequal(layers, [nonlinearity] * len(hidden_sizes))))
+    """A simple n-layer linear network with nonlinearity.
+
+    See `NLayerLinear` for the meaning of `stacked`, `use_pallas`, `dtype`, and
+    `checkpoint_layers`. If
+    `quantize` is `"int8"`, the weights are quantized after initialization with
+    `NLayerLinear.quantize_int8`.
+    """
+    net = NLayerLinear(
+        (input_size,) + tuple(hidden_sizes) + (out_size,),
+        use_bias=use_bias,
+        nonlinearity=nonlinearity,
+        stacked=stacked,
+        use_pallas=use_pallas,
+        dtype=dtype,
+        checkpoint_layers=checkpoint_layers,
+        key=key,
+    )
+    if quantize == "int8":
+        net = net.quantize_int8()
+    elif quantize is not None:
+        raise ValueError(f"Unsupported quantization: {quantize}")
+    return net
 
 
 def two_layer_linear(
-    hidden_size, input_size, out_size, use_bias=True, nonlinearity=jnp.tanh, *, key
+    hidden_size,
+    input_size,
+    out_size,
+    use_bias=True,
+    nonlinearity=jnp.tanh,
+    use_pallas=False,
+    quantize=None,
+    dtype=None,
+    *,
+    key,
 ):
     """A two-layer linear network with nonlinearity.
 
@@ -811,6 +1310,9 @@ def two_layer_linear(
         out_size,
         use_bias=use_bias,
         nonlinearity=nonlinearity,
+        use_pallas=use_pallas,
+        quantize=quantize,
+        dtype=dtype,
         key=key,
     )
 
@@ -818,17 +1320,93 @@ def two_layer_linear(
 def gru_weight_idxs_func(
     label: Literal["candidate", "update", "reset"],
 ) -> Callable[[Array], slice]:
-    """Returns a function that returns a slice of a subset of the GRU weights.
+    """DEPRECATED. Use `split_gru_weights`.
 
-    TODO: Should probably just return a function that returns the subset of weights directly, rather than their indices.
+    Returns a function that returns a slice of a subset of the GRU weights.
     """
 
     def gru_weight_idxs(weights):
-        len_by_3 = weights.shape[-2] // 3
-        return {
-            "reset": slice(0, len_by_3),
-            "update": slice(len_by_3, 2 * len_by_3),
-            "candidate": slice(2 * len_by_3, None),
-        }[label]
+        start, size = gru_gate_offsets(label, weights)
+        return slice(start, start + size)
 
     return gru_weight_idxs
+
+
+_GRU_GATE_LABELS = ("reset", "update", "candidate")
+
+
+def gru_gate_offsets(
+    label: Literal["candidate", "update", "reset"],
+    weights: Array,
+    axis: int = -2,
+) -> tuple[int, int]:
+    """Return the offset and size of the weights of one gate, in stacked GRU weights.
+
+    Both are Python integers, so that e.g.
+    `jax.lax.dynamic_slice_in_dim(weights, start, size, axis)` or
+    `jax.lax.dynamic_update_slice_in_dim(weights, update, start, axis)` lower to
+    static slices.
+
+    Arguments:
+        label: The gate.
+        weights: Weights whose `axis` stacks the reset, update, and candidate gates,
+            as in `eqx.nn.GRUCell.weight_hh`.
+        axis: The axis along which the gates are stacked.
+
+    Returns:
+        The offset of the gate's weights along `axis`, and their size.
+    """
+    size = weights.shape[axis] // 3
+    return _GRU_GATE_LABELS.index(label) * size, size
+
+
+def split_gru_weights(weights: Array, axis: int = -2) -> dict[str, Array]:
+    """Split stacked GRU weights into the weights of each gate.
+
+    Arguments:
+        weights: Weights whose `axis` stacks the reset, update, and candidate gates,
+            in that order. Any other axes (e.g. ensemble members) are kept.
+        axis: The axis along which the gates are stacked. The default of `-2` is
+            for the `(3 * hidden_size, in)` layout of `eqx.nn.GRUCell.weight_ih`
+            and `eqx.nn.GRUCell.weight_hh`; use `-1` for weights stored transposed,
+            with shape `(in, 3 * hidden_size)`.
+
+    Returns:
+        A dict mapping `"reset"`, `"update"`, and `"candidate"` to the respective
+        weights.
+    """
+    return dict(zip(_GRU_GATE_LABELS, jnp.split(weights, 3, axis=axis)))
+
+
+def gru_gates_preact(
+    weight: Array,
+    x: Array,
+    bias: Optional[Array] = None,
+    transposed: bool = False,
+) -> dict[str, Array]:
+    """Return the preactivations of each GRU gate, computed with a single matmul.
+
+    The matmul is performed with the stacked weights of all three gates, and only
+    its result is split by gate.
+
+    !!! Note
+        As in `eqx.nn.GRUCell`, the input and hidden contributions should be
+        computed separately, since the reset gate scales the hidden contribution to
+        the candidate gate.
+
+    Arguments:
+        weight: Weights stacking the reset, update, and candidate gates, with shape
+            `(3 * hidden_size, in)`, e.g. `eqx.nn.GRUCell.weight_ih`.
+        x: The input to the weights, with shape `(in,)`.
+        bias: An optional bias, with shape `(3 * hidden_size,)`.
+        transposed: Whether `weight` is stored transposed, with shape
+            `(in, 3 * hidden_size)`, in which case the matmul is `x @ weight`.
+
+    Returns:
+        A dict mapping `"reset"`, `"update"`, and `"candidate"` to the respective
+        preactivations.
+    """
+    preact = x @ weight if transposed else weight @ x
+    if bias is not None:
+        preact = preact + bias
+    return dict(zip(_GRU_GATE_LABELS, jnp.split(preact, 3, axis=-1)))
@@ -0,0 +1,105 @@
+"""Fused Pallas kernels for small feedforward networks.
+
+Pallas ships with JAX as an experimental module, and may not be available on
+every platform or version. Check `PALLAS_AVAILABLE` before using the kernels.
+
+:copyright: Copyright 2023-2024 by Matt L Laporte.
+:license: Apache 2.0, see LICENSE for details.
+"""
+
+import logging
+from collections.abc import Callable
+from functools import partial
+
+import jax
+import jax.numpy as jnp
+from jaxtyping import Array, Float
+
+try:
+    from jax.experimental import pallas as pl
+except ImportError:
+    pl = None
+
+
+logger = logging.getLogger(__name__)
+
+
+PALLAS_AVAILABLE = pl is not None
+
+
+def _dot_nt(a: Array, b: Array) -> Array:
+    """Return `a @ b.T` for 2D `a` and `b`, accumulating in float32."""
+    return jax.lax.dot_general(
+        a, b, (((1,), (1,)), ((), ())), preferred_element_type=jnp.float32
+    )
+
+
+def _fused_two_layer_kernel(
+    x_ref, w1_ref, b1_ref, w2_ref, b2_ref, y_ref, *, nonlinearity
+):
+    # The hidden activity of the block of inputs stays on-chip, between the matmuls
+    x = x_ref[...].astype(w1_ref.dtype)
+    hidden = nonlinearity(_dot_nt(x, w1_ref[...]) + b1_ref[...])
+    y = _dot_nt(hidden.astype(w2_ref.dtype), w2_ref[...]) + b2_ref[...]
+    y_ref[...] = y.astype(y_ref.dtype)
+
+
+def fused_two_layer(
+    x: Float[Array, "batch in"],
+    w1: Float[Array, "hidden in"],
+    b1: Float[Array, "hidden"],
+    w2: Float[Array, "out hidden"],
+    b2: Float[Array, "out"],
+    nonlinearity: Callable[[Float], Float] = jnp.tanh,
+    *,
+    block_rows: int = 128,
+    interpret: bool | None = None,
+) -> Float[Array, "batch out"]:
+    """Compute `nonlinearity(x @ w1.T + b1) @ w2.T + b2` in a single kernel.
+
+    The batch is split into blocks of `block_rows` inputs, over a grid. Each step
+    of the grid loads one block of inputs along with all of the weights, so the
+    layers should be small enough for their weights to fit on-chip.
+
+    The kernel has no autodiff rule, so this is only suitable for inference.
+
+    Arguments:
+        x: The inputs, one per row.
+        w1: The weights of the hidden layer.
+        b1: The biases of the hidden layer.
+        w2: The weights of the output layer.
+        b2: The biases of the output layer.
+        nonlinearity: The nonlinearity applied to the hidden layer.
+        block_rows: The maximum number of inputs in each block of the batch.
+        interpret: Whether to run the kernel in the Pallas interpreter. By default,
+            only when the default backend is the CPU, which has no Pallas lowering.
+    """
+    if not PALLAS_AVAILABLE:
+        raise ImportError("Pallas is not available in this installation of JAX")
+    if interpret is None:
+        interpret = jax.default_backend() == "cpu"
+
+    n_batch, n_in = x.shape
+    n_hidden, n_out = w1.shape[0], w2.shape[0]
+    block_rows = min(block_rows, n_batch)
+
+    def whole(shape):
+        # Every step of the grid gets the entire array
+        return pl.BlockSpec(shape, lambda i: (0,) * len(shape))
+
+    return pl.pallas_call(
+        partial(_fused_two_layer_kernel, nonlinearity=nonlinearity),
+        out_shape=jax.ShapeDtypeStruct(
+            (n_batch, n_out), jnp.result_type(x, w1, w2)
+        ),
+        grid=(pl.cdiv(n_batch, block_rows),),
+        in_specs=[
+            pl.BlockSpec((block_rows, n_in), lambda i: (i, 0)),
+            whole((n_hidden, n_in)),
+            whole((1, n_hidden)),
+            whole((n_out, n_hidden)),
+            whole((1, n_out)),
+        ],
+        out_specs=pl.BlockSpec((block_rows, n_out), lambda i: (i, 0)),
+        interpret=interpret,
+    )(x, w1, b1.reshape(1, n_hidden), w2, b2.reshape(1, n_out))
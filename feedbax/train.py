@@ -1001,6 +1001,18 @@ def init_task_trainer_history(
     )
 
 
+@eqx.filter_jit
+def nan_safe_mse(preds: Array, targets: Array) -> Array:
+    """Mean squared error over the entries of `targets` that are not NaN.
+
+    NaN targets are masked out with selects before subtraction, so they contribute
+    to neither the loss nor its gradient.
+    """
+    mask = ~jnp.isnan(targets)
+    diff = jnp.where(mask, preds - jnp.where(mask, targets, preds), 0.0)
+    return jnp.sum(diff * diff) / jnp.maximum(jnp.sum(mask), 1)
+
+
 def grad_wrap_simple_loss_func(
     loss_func: Callable[[Array, Array], Float],
     nan_safe: bool = False,
@@ -1013,8 +1025,8 @@ def grad_wrap_simple_loss_func(
 
     If `nan_safe == True`, the wrapped function will replace NaNs in the inputs before
     performing the forward pass, to ensure that gradients remain finite. In that case,
-    a NaN-safe loss function (like `nan_safe_mse`) should be used, so that the respective
-    training examples are excluded from the aggregate loss.
+    a NaN-safe loss function (like [`nan_safe_mse`][feedbax.train.nan_safe_mse]) should
+    be used, so that the respective training examples are excluded from the aggregate loss.
     """
 
     if nan_safe:
@@ -1056,7 +1068,7 @@ class SimpleTrainer(eqx.Module):
     def __call__(self, model, X, y, n_iter=100, progress_bar=True):
         opt_state = self.optimizer.init(model)
 
-        # @eqx.filter_jit
+        @eqx.filter_jit
         def train_step(current_model, current_opt_state, x_batch, y_batch):
             loss_value, grads = jax.value_and_grad(self.loss_func)(current_model, x_batch, y_batch)
             updates, new_opt_state = self.optimizer.update(grads, current_opt_state)
@@ -12,6 +12,7 @@ import jax.numpy as jnp
 
 from feedbax.loss import (
     CompositeLoss,
+    EffectorFixationLoss,
     TargetSpec,
     TargetStateLoss,
     power_discount,
@@ -14,11 +14,9 @@ import jax.tree as jt
 from feedbax.loss import (
     AbstractLoss,
     CompositeLoss, 
-    EffectorFinalVelocityLoss,
-    EffectorPositionLoss,
-    NetworkActivityLoss,
-    NetworkOutputLoss,
-    power_discount,
+    EffectorFixationLoss,
+    EffectorStraightPathLoss,
+    StopAtGoalLoss,
 )
 
 
@@ -28,17 +26,15 @@ logger = logging.getLogger(__name__)
 def test_loss_composition():
     """Test that loss is constructed the same way via different methods."""
     loss_term_weights = dict(
-        effector_position=1.,
-        effector_final_velocity=1.,
-        nn_output=1e-5,
-        nn_hidden=1e-5,
+        effector_fixation=1.,
+        effector_path_straightness=1e-5,
+        effector_stop_at_goal=1.,
     )
 
     loss_classes = dict(
-        effector_position=EffectorPositionLoss,
-        effector_final_velocity=EffectorFinalVelocityLoss,
-        nn_output=NetworkOutputLoss,  
-        nn_hidden=NetworkActivityLoss,
+        effector_fixation=EffectorFixationLoss,
+        effector_path_straightness=EffectorStraightPathLoss,
+        effector_stop_at_goal=StopAtGoalLoss,
     )
 
     loss_from_dicts = CompositeLoss(
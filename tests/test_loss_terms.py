@@ -0,0 +1,192 @@
+"""
+
+:copyright: Copyright 2023-2024 by Matt Laporte.
+:license: Apache 2.0. See LICENSE for details.
+"""
+
+from types import SimpleNamespace
+
+import equinox as eqx
+import jax.numpy as jnp
+import jax.random as jr
+import jax.tree as jt
+from jaxtyping import Array
+
+from feedbax._mapping import WhereDict
+from feedbax.loss import (
+    CompositeLoss,
+    EffectorFixationLoss,
+    KinematicDiscountedLoss,
+    TargetSpec,
+    TargetStateLoss,
+    TermTree,
+    power_discount,
+)
+from feedbax.task import TaskTrialSpec
+
+
+N_TRIALS = 3
+N_STEPS = 7
+
+
+def _effector_states(key):
+    pos_key, vel_key = jr.split(key)
+    effector = SimpleNamespace(
+        pos=jr.normal(pos_key, (N_TRIALS, N_STEPS + 1, 2)),
+        vel=jr.normal(vel_key, (N_TRIALS, N_STEPS + 1, 2)),
+    )
+    return SimpleNamespace(mechanics=SimpleNamespace(effector=effector))
+
+
+class _Inputs(eqx.Module):
+    hold: Array
+
+
+def _trial_specs(targets, key, inputs=None):
+    return TaskTrialSpec(
+        inits=WhereDict(
+            {(lambda state: state.mechanics.effector.pos): jr.normal(key, (N_TRIALS, 2))}
+        ),
+        targets=WhereDict(targets),
+        inputs=inputs,
+    )
+
+
+def test_effector_fixation_loss():
+    """Test that the fixation loss matches a `TargetStateLoss` masked by the hold signal."""
+    keys = jr.split(jr.PRNGKey(1), 3)
+    states = _effector_states(keys[0])
+    hold = (jnp.arange(N_STEPS) < 4).astype(float)
+    trial_specs = _trial_specs(
+        {
+            (lambda state: state.mechanics.effector.pos): TargetSpec(
+                value=jr.normal(keys[1], (N_TRIALS, N_STEPS, 2)),
+            ),
+        },
+        keys[2],
+        inputs=_Inputs(hold=jnp.broadcast_to(hold[:, None], (N_TRIALS, N_STEPS, 1))),
+    )
+
+    loss_masked = TargetStateLoss(
+        "effector_fixation",
+        where=lambda state: state.mechanics.effector.pos,
+        spec=TargetSpec(time_mask=lambda trial_spec: trial_spec.inputs.hold[:, 0]),
+    )
+
+    assert jnp.allclose(
+        EffectorFixationLoss()(states, trial_specs, None).value,
+        loss_masked(states, trial_specs, None).value,
+        rtol=1e-5,
+    )
+
+
+def test_kinematic_discounted_loss():
+    """Test that the fused kinematic loss matches the equivalent `TargetStateLoss` terms."""
+    keys = jr.split(jr.PRNGKey(0), 3)
+    states = _effector_states(keys[0])
+    # The velocity target spec is given per-label, and only for the final time step
+    trial_specs = _trial_specs(
+        {
+            (lambda state: state.mechanics.effector.pos): TargetSpec(
+                value=jr.normal(keys[1], (N_TRIALS, 1, 2)),
+            ),
+            (lambda state: state.mechanics.effector.vel): dict(
+                vel=TargetSpec(value=None, time_idxs=jnp.array([-1])),
+            ),
+        },
+        keys[2],
+    )
+    weights = dict(pos=1.0, vel=0.5)
+
+    default_spec = TargetSpec(
+        value=jnp.array(0.0), discount=power_discount(N_STEPS, 6)
+    )
+    loss_composite = CompositeLoss(
+        dict(
+            pos=TargetStateLoss(
+                "pos", where=lambda state: state.mechanics.effector.pos, spec=default_spec
+            ),
+            vel=TargetStateLoss(
+                "vel", where=lambda state: state.mechanics.effector.vel, spec=default_spec
+            ),
+        ),
+        weights=weights,
+        label="effector_kinematics",
+    )
+    loss_fused = KinematicDiscountedLoss(weights=weights)
+
+    losses_composite = loss_composite(states, trial_specs, None)
+    losses_fused = loss_fused(states, trial_specs, None)
+
+    assert losses_fused.names == losses_composite.names
+    for name in weights:
+        assert jnp.allclose(
+            losses_fused[name].value, losses_composite[name].value, rtol=1e-5
+        )
+    assert jnp.allclose(losses_fused.total, losses_composite.total, rtol=1e-5)
+
+
+def _example_term_tree():
+    return TermTree.branch(
+        "total",
+        dict(
+            a=TermTree.leaf("a", jnp.arange(4.0)).with_weight(0.5),
+            b=TermTree.branch(
+                "b",
+                dict(
+                    c=TermTree.leaf("c", jnp.ones((2, 3))),
+                    d=TermTree.leaf("d", jnp.array([1.0, 3.0])).with_weight(2.0),
+                ),
+            ),
+        ),
+    )
+
+
+def test_term_tree_total_after_map():
+    """Test that `total` reflects the values of a tree mapped over as a PyTree."""
+    tree = _example_term_tree()
+    mapped = jt.map(lambda x: 3 * x, tree)
+
+    assert jnp.allclose(mapped.total, mapped.aggregate())
+    assert jnp.allclose(mapped.total, 3 * tree.total)
+    assert jnp.allclose(tree.map(lambda x: 3 * x).total, mapped.total)
+    assert jnp.allclose(eqx.filter_jit(lambda t: t)(tree).total, tree.aggregate())
+
+
+def test_term_tree_aggregate_generic():
+    """Test that aggregating with non-default operations matches a manual fold."""
+    tree = _example_term_tree()
+    # Weighted maximum of the leaf means; the root and branch `b` have unit weight
+    expected = jnp.maximum(0.5 * 1.5, jnp.maximum(1.0, 2.0 * 2.0))
+
+    assert jnp.allclose(tree.aggregate(plus=jnp.maximum), expected)
+    assert jnp.allclose(
+        tree.aggregate(plus=lambda x, y: x + y, times=lambda w, x: w * x),
+        tree.aggregate(),
+    )
+
+
+def test_target_state_loss_specialize():
+    """Test that specializing a `TargetStateLoss` to a task does not change its value."""
+    keys = jr.split(jr.PRNGKey(2), 3)
+    states = _effector_states(keys[0])
+    target_value = jr.normal(keys[1], (N_TRIALS, 1, 2))
+    where_pos = lambda state: state.mechanics.effector.pos
+    loss = TargetStateLoss(
+        "pos", where=where_pos, spec=TargetSpec(value=jnp.array(0.0))
+    )
+
+    task_targets = dict(
+        none={},
+        spec={where_pos: TargetSpec(value=target_value)},
+        mapping={where_pos: dict(pos=TargetSpec(value=target_value))},
+    )
+    for kind, targets in task_targets.items():
+        trial_specs = _trial_specs(targets, keys[2])
+        loss_specialized = loss.specialize(trial_specs.targets)
+
+        assert loss_specialized.task_spec_kind == kind
+        assert jnp.allclose(
+            loss_specialized(states, trial_specs, None).value,
+            loss(states, trial_specs, None).value,
+        )
@@ -0,0 +1,226 @@
+"""
+
+:copyright: Copyright 2023-2024 by Matt Laporte.
+:license: Apache 2.0. See LICENSE for details.
+"""
+
+import equinox as eqx
+import jax
+import jax.numpy as jnp
+import jax.random as jr
+import jax.tree as jt
+import pytest
+
+from feedbax._model import ModelInput
+from feedbax.intervene import AddNoise, add_intervenors
+from feedbax.nn import (
+    NLayerLinear,
+    QuantizedLinear,
+    SimpleStagedNetwork,
+    gru_gate_offsets,
+    gru_gates_preact,
+    gru_weight_idxs_func,
+    n_layer_linear,
+    split_gru_weights,
+)
+from feedbax.nn_pallas import PALLAS_AVAILABLE, fused_two_layer
+
+
+def _sequential(net: NLayerLinear) -> eqx.nn.Sequential:
+    """Return the `eqx.nn.Sequential` of linear layers with the weights of `net`."""
+    layers = []
+    for weight, bias in zip(net.weights, net.biases):
+        linear = eqx.nn.Linear(weight.shape[1], weight.shape[0], key=jr.PRNGKey(0))
+        linear = eqx.tree_at(lambda l: (l.weight, l.bias), linear, (weight, bias))
+        layers += [linear, eqx.nn.Lambda(net.nonlinearity)]
+    return eqx.nn.Sequential(layers[:-1])
+
+
+@pytest.mark.parametrize("sizes", [(3, 2), (3, 8, 2), (3, 8, 6, 2), (3, 8, 8, 8, 2)])
+def test_n_layer_linear(sizes):
+    """Test that `NLayerLinear` matches a `Sequential` of linear layers."""
+    key_net, key_x = jr.split(jr.PRNGKey(0))
+    net = NLayerLinear(sizes, key=key_net)
+    x = jr.normal(key_x, (sizes[0],))
+
+    assert len(net.weights) == len(sizes) - 1
+    assert jnp.allclose(net(x), _sequential(net)(x), atol=1e-6)
+
+
+def test_n_layer_linear_stacked():
+    """Test that storing the interior layers as one array changes neither the
+    initialization nor the output."""
+    sizes = (3, 8, 8, 8, 8, 2)
+    key_net, key_x = jr.split(jr.PRNGKey(0))
+    net = NLayerLinear(sizes, key=key_net)
+    net_stacked = NLayerLinear(sizes, stacked=True, key=key_net)
+    x = jr.normal(key_x, (sizes[0],))
+
+    assert net_stacked.stacked_weight.shape == (3, 8, 8)
+    assert jnp.array_equal(net_stacked.stacked_weight, jnp.stack(net.weights[1:-1]))
+    assert jnp.array_equal(net_stacked.stacked_bias, jnp.stack(net.biases[1:-1]))
+    assert jnp.allclose(net_stacked(x), net(x), atol=1e-6)
+
+    with pytest.raises(ValueError):
+        NLayerLinear((3, 8, 6, 2), stacked=True, key=key_net)
+
+
+@pytest.mark.parametrize("stacked", [False, True])
+def test_n_layer_linear_checkpoint(stacked):
+    """Test that checkpointing the interior layers does not change the gradients."""
+    sizes = (3, 8, 8, 8, 2)
+    key_net, key_x = jr.split(jr.PRNGKey(0))
+    x = jr.normal(key_x, (sizes[0],))
+
+    def grads(checkpoint_layers):
+        net = NLayerLinear(
+            sizes, stacked=stacked, checkpoint_layers=checkpoint_layers, key=key_net
+        )
+        return eqx.filter_grad(lambda net: jnp.sum(net(x) ** 2))(net)
+
+    for grad, grad_checkpointed in zip(jt.leaves(grads(False)), jt.leaves(grads(True))):
+        assert jnp.allclose(grad, grad_checkpointed, atol=1e-6)
+
+
+def test_quantized_linear():
+    """Test that an int8 linear layer approximates the floating point layer."""
+    key_linear, key_x = jr.split(jr.PRNGKey(0))
+    linear = eqx.nn.Linear(16, 4, key=key_linear)
+    linear_int8 = QuantizedLinear(linear.weight, linear.bias)
+    x = jr.normal(key_x, (16,))
+
+    assert linear_int8.weight.dtype == jnp.int8
+    assert jnp.allclose(linear_int8(x), linear(x), atol=0.02)
+    # Rows of zeros must not produce NaNs through their scale
+    zeros_int8 = QuantizedLinear(jnp.zeros((4, 16)))
+    assert jnp.array_equal(zeros_int8(x), jnp.zeros(4))
+
+
+@pytest.mark.parametrize("stacked", [False, True])
+def test_n_layer_linear_int8(stacked):
+    """Test that an int8-quantized `NLayerLinear` approximates the original network."""
+    key_net, key_x = jr.split(jr.PRNGKey(0))
+    net = n_layer_linear((8, 8, 8), 3, 2, stacked=stacked, key=key_net)
+    net_int8 = n_layer_linear((8, 8, 8), 3, 2, stacked=stacked, quantize="int8", key=key_net)
+    x = jr.normal(key_x, (3,))
+
+    assert all(weight.dtype == jnp.int8 for weight in net_int8.weights)
+    assert net_int8.quantize_int8() is net_int8
+    assert jnp.allclose(net_int8(x), net(x), atol=0.02)
+
+
+@pytest.mark.skipif(not PALLAS_AVAILABLE, reason="Pallas is not available")
+def test_n_layer_linear_pallas():
+    """Test that the fused Pallas network matches the unfused computation."""
+    key_net, key_x = jr.split(jr.PRNGKey(0))
+    net_fused = NLayerLinear((5, 16, 3), use_pallas=True, key=key_net)
+    net = NLayerLinear((5, 16, 3), key=key_net)
+    xs = jr.normal(key_x, (10, 5))
+
+    assert jnp.allclose(net_fused(xs[0]), net(xs[0]), atol=1e-5)
+    assert jnp.allclose(jax.vmap(net_fused)(xs), jax.vmap(net)(xs), atol=1e-5)
+
+    # A batch that is not a multiple of the block size
+    (w1, w2), (b1, b2) = net.weights, net.biases
+    assert jnp.allclose(
+        fused_two_layer(xs, w1, b1, w2, b2, block_rows=4),
+        jax.vmap(net)(xs),
+        atol=1e-5,
+    )
+
+
+def test_scan_layers():
+    """Test that scanning over stacked networks matches stepping them in a loop."""
+    n_layers, size = 3, 4
+    key_nets, key_init, key_input, key_step = jr.split(jr.PRNGKey(0), 4)
+    layers = eqx.filter_vmap(
+        lambda key: SimpleStagedNetwork(size, 8, out_size=size, key=key)
+    )(jr.split(key_nets, n_layers))
+    states = eqx.filter_vmap(lambda net, key: net.init(key=key))(
+        layers, jr.split(key_init, n_layers)
+    )
+    input_ = ModelInput(jr.normal(key_input, (size,)), {})
+
+    states_scanned = SimpleStagedNetwork.scan_layers(layers, input_, states, key=key_step)
+
+    layers_dynamic, layers_static = eqx.partition(layers, eqx.is_array)
+    layer_input = input_.value
+    for i, key in enumerate(jr.split(key_step, n_layers)):
+        layer = eqx.combine(jt.map(lambda x: x[i], layers_dynamic), layers_static)
+        state = layer(
+            ModelInput(layer_input, input_.intervene),
+            jt.map(lambda x: x[i], states),
+            key,
+        )
+        assert jnp.allclose(states_scanned.hidden[i], state.hidden, atol=1e-6)
+        assert jnp.allclose(states_scanned.output[i], state.output, atol=1e-6)
+        layer_input = state.output
+
+
+def test_model_spec_nonlinearity_stages():
+    """Test that intervenors can be added to the default nonlinearity stages after
+    the network is constructed."""
+    net = SimpleStagedNetwork(3, 8, out_size=2, hidden_noise_std=0.1, key=jr.PRNGKey(0))
+    stage_names = ("hidden_nonlinearity", "hidden_noise", "out_nonlinearity")
+
+    assert all(stage_name in net.model_spec for stage_name in stage_names)
+    for stage_name in stage_names:
+        net_intervened = add_intervenors(
+            net, lambda net: net, [AddNoise(out_where=lambda state: state.hidden)],
+            stage_name=stage_name,
+        )
+        assert net_intervened.model_spec.keys() == net.model_spec.keys()
+
+
+def test_split_gru_weights():
+    """Test that splitting stacked GRU weights gives the weights of each gate."""
+    hidden_size = 4
+    cell = eqx.nn.GRUCell(3, hidden_size, key=jr.PRNGKey(0))
+    gates = ("reset", "update", "candidate")
+
+    weights = split_gru_weights(cell.weight_hh)
+    weights_transposed = split_gru_weights(cell.weight_hh.T, axis=-1)
+    weights_ensemble = split_gru_weights(jnp.stack([cell.weight_ih, -cell.weight_ih]))
+
+    for i, gate in enumerate(gates):
+        gate_slice = slice(i * hidden_size, (i + 1) * hidden_size)
+        assert jnp.array_equal(weights[gate], cell.weight_hh[gate_slice])
+        assert jnp.array_equal(weights_transposed[gate], cell.weight_hh[gate_slice].T)
+        assert jnp.array_equal(weights_ensemble[gate][1], -cell.weight_ih[gate_slice])
+
+
+@pytest.mark.parametrize("transposed", [False, True])
+def test_gru_gates_preact(transposed):
+    """Test that a GRU step computed from per-gate preactivations matches `GRUCell`."""
+    key_cell, key_x, key_h = jr.split(jr.PRNGKey(0), 3)
+    cell = eqx.nn.GRUCell(3, 4, key=key_cell)
+    x, h = jr.normal(key_x, (3,)), jr.normal(key_h, (4,))
+
+    def layout(weight):
+        return weight.T if transposed else weight
+
+    igates = gru_gates_preact(layout(cell.weight_ih), x, cell.bias, transposed=transposed)
+    hgates = gru_gates_preact(layout(cell.weight_hh), h, transposed=transposed)
+    reset = jax.nn.sigmoid(igates["reset"] + hgates["reset"])
+    update = jax.nn.sigmoid(igates["update"] + hgates["update"])
+    candidate = jnp.tanh(igates["candidate"] + reset * (hgates["candidate"] + cell.bias_n))
+
+    assert jnp.allclose(candidate + update * (h - candidate), cell(x, h), atol=1e-6)
+
+
+def test_gru_gate_offsets():
+    """Test that static gate offsets select the same weights as splitting them."""
+    cell = eqx.nn.GRUCell(3, 4, key=jr.PRNGKey(0))
+    weights = split_gru_weights(cell.weight_ih)
+
+    for gate, weight in weights.items():
+        start, size = gru_gate_offsets(gate, cell.weight_ih)
+        assert isinstance(start, int) and isinstance(size, int)
+        assert jnp.array_equal(
+            jax.lax.dynamic_slice_in_dim(cell.weight_ih, start, size, axis=-2), weight
+        )
+        assert jnp.array_equal(
+            cell.weight_ih[gru_weight_idxs_func(gate)(cell.weight_ih)], weight
+        )
+        start_t, size_t = gru_gate_offsets(gate, cell.weight_ih.T, axis=-1)
+        assert (start_t, size_t) == (start, size)
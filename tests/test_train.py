@@ -0,0 +1,28 @@
+"""
+
+:copyright: Copyright 2023-2024 by Matt Laporte.
+:license: Apache 2.0. See LICENSE for details.
+"""
+
+import jax
+import jax.numpy as jnp
+import jax.random as jr
+
+from feedbax.train import nan_safe_mse
+
+
+def test_nan_safe_mse():
+    """Test that NaN targets are excluded from both the loss and its gradient."""
+    key_preds, key_targets = jr.split(jr.PRNGKey(0))
+    preds = jr.normal(key_preds, (4, 5))
+    targets = jr.normal(key_targets, (4, 5))
+    targets = targets.at[1].set(jnp.nan).at[2, 3].set(jnp.nan)
+    mask = ~jnp.isnan(targets)
+
+    expected = jnp.mean((preds[mask] - targets[mask]) ** 2)
+    grad = jax.grad(nan_safe_mse)(preds, targets)
+
+    assert jnp.allclose(nan_safe_mse(preds, targets), expected)
+    assert jnp.all(jnp.isfinite(grad))
+    assert jnp.all(grad[~mask] == 0)
+    assert jnp.allclose(nan_safe_mse(preds, jnp.full_like(targets, jnp.nan)), 0)